@@ -1,14 +1,19 @@
 from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
-from pymongo import MongoClient
+import pymongo
+from pymongo import MongoClient, monitoring
 from bson import ObjectId
 from datetime import datetime, timedelta
 import bcrypt
 import jwt
 import os
 import re
+import threading
+import time
 from functools import wraps
 from urllib.parse import quote
+from urllib.request import Request, urlopen
+from urllib.error import HTTPError
 from dotenv import load_dotenv
 from twilio.rest import Client
 from twilio.base.exceptions import TwilioException
@@ -35,10 +40,84 @@ twilio_client = None
 if TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN:
     twilio_client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
 
+# Health monitor configuration
+def env_seconds(name, default, minimum):
+    """Read a duration from the environment, falling back to default when it is invalid or below minimum."""
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        value = None
+    if value is None or value < minimum:
+        print(f"Ignoring {name}={raw!r}: expected a number of seconds >= {minimum}, using {default}")
+        return default
+    return value
+
+HEALTH_CHECK_INTERVAL = env_seconds('HEALTH_CHECK_INTERVAL', 15.0, 1.0)
+HEALTH_CHECK_TIMEOUT = env_seconds('HEALTH_CHECK_TIMEOUT', 2.0, 0.1)
+# Any HTTP response from this URL counts as "reachable"; point it at a local stand-in for tests
+TWILIO_HEALTH_URL = os.getenv('TWILIO_HEALTH_URL', 'https://api.twilio.com/')
+POOL_SATURATION_WARNING = 0.8
+
+
+class PoolUsageListener(monitoring.ConnectionPoolListener):
+    """Track how many pooled MongoDB connections are checked out, per server."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked_out = {}
+
+    def checked_out(self):
+        """Return the highest checked-out count across servers."""
+        with self._lock:
+            return max(self._checked_out.values(), default=0)
+
+    def _adjust(self, address, delta):
+        with self._lock:
+            self._checked_out[address] = max(0, self._checked_out.get(address, 0) + delta)
+
+    def connection_checked_out(self, event):
+        self._adjust(event.address, 1)
+
+    def connection_checked_in(self, event):
+        self._adjust(event.address, -1)
+
+    def pool_cleared(self, event):
+        # Connections checked out before the clear still report their check-ins
+        pass
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._checked_out.pop(event.address, None)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
 
+    def connection_check_out_failed(self, event):
+        pass
+
+
+pool_listener = PoolUsageListener()
 
 # MongoDB connection
-client = MongoClient(MONGO_URI)
+client = MongoClient(MONGO_URI, event_listeners=[pool_listener])
 db = client[DATABASE_NAME]
 
 # Collections
@@ -553,10 +632,195 @@ def scan_missed_checks(user_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-# Health check endpoint
+# ==================== HEALTH MONITOR ====================
+
+def check_mongo():
+    """Ping MongoDB, bounded by HEALTH_CHECK_TIMEOUT (including server selection)."""
+    started = time.perf_counter()
+    try:
+        with pymongo.timeout(HEALTH_CHECK_TIMEOUT):
+            client.admin.command('ping')
+    except Exception as e:
+        # The full driver message lists every host in MONGO_URI; keep it out of the public response
+        print(f"Health check: MongoDB ping failed: {e}")
+        return {'status': 'down', 'error': type(e).__name__}
+    return {'status': 'ok', 'latency_ms': round((time.perf_counter() - started) * 1000, 2)}
+
+
+def check_mongo_pool():
+    """Report how close the busiest connection pool is to maxPoolSize."""
+    max_pool_size = client.options.pool_options.max_pool_size
+    checked_out = pool_listener.checked_out()
+    saturation = checked_out / max_pool_size if max_pool_size else 0.0
+    return {
+        'status': 'degraded' if saturation >= POOL_SATURATION_WARNING else 'ok',
+        'checked_out': checked_out,
+        'max_pool_size': max_pool_size,
+        'saturation': round(saturation, 3)
+    }
+
+
+def check_twilio():
+    """Check that the Twilio API host answers; skipped when Twilio is not configured."""
+    if not twilio_client:
+        return {'status': 'not_configured'}
+    started = time.perf_counter()
+    try:
+        urlopen(Request(TWILIO_HEALTH_URL, method='HEAD'), timeout=HEALTH_CHECK_TIMEOUT).close()
+    except HTTPError:
+        # Any HTTP status (401, 404, ...) still proves the API is reachable
+        pass
+    except Exception as e:
+        # Connection errors, malformed TWILIO_HEALTH_URL, bad HTTP responses, ...
+        print(f"Health check: Twilio probe failed: {e}")
+        return {'status': 'down', 'error': type(e).__name__}
+    return {'status': 'ok', 'latency_ms': round((time.perf_counter() - started) * 1000, 2)}
+
+
+class HealthMonitor:
+    """Refresh dependency checks on a background thread and cache the latest snapshot.
+
+    Health endpoints read the cached snapshot instead of touching MongoDB or Twilio,
+    so probes stay cheap no matter how often the load balancer calls them. When there
+    is no snapshot yet or it has gone stale (cold start, or a serverless instance that
+    was frozen), the first caller refreshes it inline and the others wait for that result.
+    """
+
+    def __init__(self, interval):
+        if interval <= 0:
+            raise ValueError('interval must be positive')
+        self.interval = interval
+        self._snapshot = None
+        self._reset_state()
+
+    def _reset_state(self):
+        self._next_run = time.monotonic()
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def after_fork_in_child(self):
+        """Drop locks and the thread handle inherited from the parent.
+
+        A fork during a refresh would otherwise leave _refresh_lock held forever in the child.
+        """
+        self._reset_state()
+
+    def ensure_running(self):
+        """Start the refresh thread, restarting it in forked workers where it does not exist."""
+        if self._thread and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._next_run = time.monotonic()
+            self._thread = threading.Thread(target=self._run, name='health-monitor', daemon=True)
+            self._thread.start()
+
+    def refresh(self, lag_ms=0.0):
+        """Run every dependency check once and publish the result."""
+        dependencies = {
+            'mongodb': check_mongo(),
+            'mongo_pool': check_mongo_pool(),
+            'twilio': check_twilio(),
+            # Lag of this monitor's own refresh loop behind its schedule
+            'scheduler': {
+                'status': 'degraded' if lag_ms > self.interval * 1000 else 'ok',
+                'lag_ms': round(lag_ms, 2),
+                'interval_seconds': self.interval
+            }
+        }
+        if dependencies['mongodb']['status'] != 'ok':
+            status = 'down'
+        elif any(dep['status'] in ('degraded', 'down') for dep in dependencies.values()):
+            status = 'degraded'
+        else:
+            status = 'ok'
+        # Replace the whole snapshot at once so readers never see a partial update
+        self._snapshot = {
+            'status': status,
+            'checked_at': datetime.utcnow(),
+            'checked_at_monotonic': time.monotonic(),
+            'dependencies': dependencies
+        }
+
+    def snapshot(self):
+        """Return the cached snapshot as a JSON-ready dict, refreshing it first if missing or stale."""
+        if self._needs_refresh():
+            with self._refresh_lock:
+                # Another caller may have refreshed while we waited for the lock
+                if self._needs_refresh():
+                    self._tick()
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {'status': 'starting', 'stale': False, 'checked_at': None, 'dependencies': {}}
+        age = time.monotonic() - snapshot['checked_at_monotonic']
+        return {
+            'status': snapshot['status'],
+            'stale': age > self.interval * 3,
+            'checked_at': snapshot['checked_at'].isoformat(),
+            'age_seconds': round(age, 3),
+            'dependencies': snapshot['dependencies']
+        }
+
+    def _needs_refresh(self):
+        snapshot = self._snapshot
+        return snapshot is None or time.monotonic() - snapshot['checked_at_monotonic'] > self.interval * 3
+
+    def _tick(self):
+        """Refresh once, reporting how far behind schedule this run started. Caller holds _refresh_lock."""
+        now = time.monotonic()
+        lag = max(0.0, now - self._next_run)
+        try:
+            self.refresh(lag * 1000)
+        except Exception as e:
+            print(f"Health monitor error: {e}")
+        if lag > self.interval:
+            # Drop missed ticks instead of bursting to catch up
+            self._next_run = now + self.interval
+        else:
+            self._next_run += self.interval
+
+    def _run(self):
+        while True:
+            delay = self._next_run - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+                continue
+            with self._refresh_lock:
+                if time.monotonic() >= self._next_run:
+                    self._tick()
+
+
+# The refresh thread starts on the first health request, so forking workers never inherit it
+health_monitor = HealthMonitor(HEALTH_CHECK_INTERVAL)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=health_monitor.after_fork_in_child)
+
+
+def health_report():
+    """Return the cached snapshot and whether it is fresh and shows MongoDB up."""
+    health_monitor.ensure_running()
+    report = health_monitor.snapshot()
+    healthy = report['status'] in ('ok', 'degraded') and not report['stale']
+    return report, healthy
+
+# Health check endpoint: is this instance working? 503 when MongoDB is down or no fresh result exists
 @app.route('/api/health', methods=['GET'])
 def health():
-    return jsonify({'status': 'ok'}), 200
+    report, healthy = health_report()
+    return jsonify(report), 200 if healthy else 503
+
+# Readiness endpoint: should this instance take new traffic right now?
+# Stricter than /api/health: also 503 while the MongoDB connection pool is saturated
+@app.route('/api/ready', methods=['GET'])
+def ready():
+    report, healthy = health_report()
+    pool = report['dependencies'].get('mongo_pool', {})
+    report['ready'] = healthy and pool.get('status') == 'ok'
+    return jsonify(report), 200 if report['ready'] else 503
 
 # Serve frontend static files
 @app.route('/', methods=['GET'])
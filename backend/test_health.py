@@ -0,0 +1,198 @@
+# Tests for the cached health monitor and the /api/health and /api/ready endpoints
+import os
+import signal
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+
+class TwilioStandIn(BaseHTTPRequestHandler):
+    """Answers like the Twilio API does without credentials: 401 for everything."""
+
+    def do_HEAD(self):
+        self.send_response(401)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+twilio_server = HTTPServer(('127.0.0.1', 0), TwilioStandIn)
+threading.Thread(target=twilio_server.serve_forever, daemon=True).start()
+TWILIO_STAND_IN_URL = f"http://127.0.0.1:{twilio_server.server_port}/"
+
+# app reads its configuration at import time
+os.environ.update({
+    'MONGO_URI': 'mongodb://127.0.0.1:1/',  # nothing listens here
+    'TWILIO_ACCOUNT_SID': 'ACtest',
+    'TWILIO_AUTH_TOKEN': 'test-token',
+    'TWILIO_HEALTH_URL': TWILIO_STAND_IN_URL,
+    'HEALTH_CHECK_INTERVAL': '60',
+    'HEALTH_CHECK_TIMEOUT': '0.3',
+})
+sys.path.insert(0, os.path.dirname(__file__))
+import app  # noqa: E402
+
+# Start the monitor and let the background thread finish its first tick so it cannot overwrite snapshots mid-test
+app.health_monitor.ensure_running()
+deadline = time.monotonic() + 5
+while app.health_monitor._snapshot is None and time.monotonic() < deadline:
+    time.sleep(0.05)
+
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+
+def test_twilio_reachable_through_stand_in():
+    result = app.check_twilio()
+    assert result['status'] == 'ok'
+    assert result['latency_ms'] >= 0
+
+
+def test_twilio_unreachable(monkeypatch):
+    monkeypatch.setattr(app, 'TWILIO_HEALTH_URL', 'http://127.0.0.1:1/')
+    assert app.check_twilio()['status'] == 'down'
+
+
+def test_twilio_malformed_url(monkeypatch):
+    monkeypatch.setattr(app, 'TWILIO_HEALTH_URL', 'not a url')
+    assert app.check_twilio()['status'] == 'down'
+
+
+def test_pool_listener_counts_checkins_after_clear():
+    listener = app.PoolUsageListener()
+    event = SimpleNamespace(address=('db', 27017))
+    listener.connection_checked_out(event)
+    listener.connection_checked_out(event)
+    listener.pool_cleared(event)
+    assert listener.checked_out() == 2
+    listener.connection_checked_in(event)
+    assert listener.checked_out() == 1
+    listener.pool_closed(event)
+    assert listener.checked_out() == 0
+
+
+def test_mongo_down_fails_health_and_ready(client):
+    app.health_monitor.refresh()
+    for path in ('/api/health', '/api/ready'):
+        response = client.get(path)
+        assert response.status_code == 503
+        assert response.json['status'] == 'down'
+        assert response.json['dependencies']['mongodb']['status'] == 'down'
+        assert response.json['dependencies']['twilio']['status'] == 'ok'
+    assert client.get('/api/ready').json['ready'] is False
+
+
+def test_degraded_dependency_still_ready(client, monkeypatch):
+    monkeypatch.setattr(app, 'check_mongo', lambda: {'status': 'ok', 'latency_ms': 1.0})
+    monkeypatch.setattr(app, 'TWILIO_HEALTH_URL', 'http://127.0.0.1:1/')
+    app.health_monitor.refresh()
+    response = client.get('/api/ready')
+    assert response.status_code == 200
+    assert response.json['status'] == 'degraded'
+    assert response.json['ready'] is True
+    assert client.get('/api/health').status_code == 200
+
+
+def test_all_ok(client, monkeypatch):
+    monkeypatch.setattr(app, 'check_mongo', lambda: {'status': 'ok', 'latency_ms': 1.0})
+    app.health_monitor.refresh()
+    response = client.get('/api/health')
+    assert response.status_code == 200
+    assert response.json['status'] == 'ok'
+    assert set(response.json['dependencies']) == {'mongodb', 'mongo_pool', 'twilio', 'scheduler'}
+
+
+def test_stale_snapshot_is_refreshed_inline(client, monkeypatch):
+    app.health_monitor.refresh()
+    assert app.health_monitor._snapshot['status'] == 'down'
+    # Pretend the instance was frozen for longer than three intervals
+    app.health_monitor._snapshot['checked_at_monotonic'] -= app.HEALTH_CHECK_INTERVAL * 4
+    monkeypatch.setattr(app, 'check_mongo', lambda: {'status': 'ok', 'latency_ms': 1.0})
+    response = client.get('/api/health')
+    assert response.status_code == 200
+    assert response.json['stale'] is False
+    assert response.json['age_seconds'] < 1
+
+
+def test_scheduler_reports_lag_of_missed_tick():
+    monitor = app.HealthMonitor(interval=1)
+    monitor._next_run = time.monotonic() - 5
+    monitor._tick()
+    scheduler = monitor._snapshot['dependencies']['scheduler']
+    assert scheduler['status'] == 'degraded'
+    assert scheduler['lag_ms'] >= 5000
+
+
+def test_mongo_error_does_not_leak_topology(client):
+    app.health_monitor.refresh()
+    error = client.get('/api/health').json['dependencies']['mongodb']['error']
+    assert '127.0.0.1' not in error
+    assert error == 'ServerSelectionTimeoutError'
+
+
+def test_twilio_bad_http_response(monkeypatch):
+    class BadStatus(BaseHTTPRequestHandler):
+        def do_HEAD(self):
+            self.wfile.write(b'garbage\r\n\r\n')
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), BadStatus)
+    threading.Thread(target=server.handle_request, daemon=True).start()
+    monkeypatch.setattr(app, 'TWILIO_HEALTH_URL', f"http://127.0.0.1:{server.server_port}/")
+    try:
+        assert app.check_twilio()['status'] == 'down'
+    finally:
+        server.server_close()
+
+
+def test_saturated_pool_is_live_but_not_ready(client, monkeypatch):
+    monkeypatch.setattr(app, 'check_mongo', lambda: {'status': 'ok', 'latency_ms': 1.0})
+    monkeypatch.setattr(app.pool_listener, 'checked_out', lambda: app.client.options.pool_options.max_pool_size)
+    app.health_monitor.refresh()
+    assert client.get('/api/health').status_code == 200
+    response = client.get('/api/ready')
+    assert response.status_code == 503
+    assert response.json['ready'] is False
+
+
+def test_invalid_interval_falls_back_to_default(monkeypatch):
+    for raw in ('0', '-5', 'soon'):
+        monkeypatch.setenv('HEALTH_CHECK_INTERVAL', raw)
+        assert app.env_seconds('HEALTH_CHECK_INTERVAL', 15.0, 1.0) == 15.0
+    monkeypatch.setenv('HEALTH_CHECK_INTERVAL', '30')
+    assert app.env_seconds('HEALTH_CHECK_INTERVAL', 15.0, 1.0) == 30.0
+    with pytest.raises(ValueError):
+        app.HealthMonitor(interval=0)
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='requires os.fork')
+def test_fork_during_refresh_does_not_deadlock_child(monkeypatch):
+    monkeypatch.setattr(app, 'check_mongo', lambda: {'status': 'ok', 'latency_ms': 1.0})
+    app.health_monitor._snapshot = None
+    holding = threading.Event()
+
+    def hold_refresh_lock():
+        with app.health_monitor._refresh_lock:
+            holding.set()
+            time.sleep(1)
+
+    holder = threading.Thread(target=hold_refresh_lock)
+    holder.start()
+    holding.wait()
+    pid = os.fork()
+    if pid == 0:
+        signal.alarm(5)
+        response = app.app.test_client().get('/api/health')
+        os._exit(0 if response.status_code == 200 else 1)
+    holder.join()
+    _, status = os.waitpid(pid, 0)
+    assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0